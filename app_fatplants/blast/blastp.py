@@ -1,6 +1,9 @@
 import subprocess
 from datetime import datetime
 import os
+import logging
+
+logger = logging.getLogger(__name__)
 
 def getDatabasePath(database: str):
     soybean_path = "/app/fatplants_volume/blast_db/soybean.fasta"
@@ -33,7 +36,7 @@ async def getPSIBlastResult(database: str, sequence: str, parameters: str):
     try:
         database_path = getDatabasePath(database)
         command_line = f"psiblast -query {input_file} -db {database_path} -out {output_file} -evalue 0.001 -num_iterations 3 {parameters}"
-        print(command_line)
+        logger.debug("%s", command_line)
         subprocess.check_output(command_line, shell=True, stderr=subprocess.STDOUT, universal_newlines=True)
         with open(output_file, 'r') as file:
             result = file.read()
@@ -107,8 +107,9 @@ async def sequence_search(species: str, sequence: str):
     species=species.lower()
     sequence=sequence.upper()
 
-    query='select uniprot_id, fp_id from '+species+'_details where sequence=\''+sequence+'\' limit 1;'
-    res = await database_conn_obj.fetch_all(query)
+    query='select uniprot_id, fp_id from '+species+'_details where sequence = :seq limit 1;'
+    res = await database_conn_obj.fetch_all(query, values={"seq": sequence})
+    return res
 
 # implemented separately from lmpd/camelina/soya
 async def fatty_acid_search(query: str):
@@ -163,8 +164,9 @@ async def count_and_log_visitor(info: str):
     res = [[res[j][i] for j in range(len(res))] for i in range(len(res[0]))]#transpose the result
     #0: total count 1-12: count of each month(12: this month, 11: last month...) 13: month of last update
 
-    if res[0][13]!=datetime.now().month:#if it's a new month
-        offset=(datetime.now().month+12-res[0][13])%12
+    now = datetime.now() #read the clock once so all month/year values below agree
+    if res[0][13]!=now.month:#if it's a new month
+        offset=(now.month+12-res[0][13])%12
         shift=res[0][1:13]+[0,0,0,0,0,0,0,0,0,0,0,0]
         query1="""
         UPDATE `fatplants`.`visitor` SET `count` = \'"""+str(shift[0+offset])+"""\' WHERE (`id` = \'1\');
@@ -179,7 +181,7 @@ async def count_and_log_visitor(info: str):
         UPDATE `fatplants`.`visitor` SET `count` = \'"""+str(shift[9+offset])+"""\' WHERE (`id` = \'10\');
         UPDATE `fatplants`.`visitor` SET `count` = \'"""+str(shift[10+offset])+"""\' WHERE (`id` = \'11\');
         UPDATE `fatplants`.`visitor` SET `count` = \'"""+str(shift[11+offset])+"""\' WHERE (`id` = \'12\');
-        UPDATE `fatplants`.`visitor` SET `count` = \'"""+str(datetime.now().month)+"""\' WHERE (`id` = \'13\');
+        UPDATE `fatplants`.`visitor` SET `count` = \'"""+str(now.month)+"""\' WHERE (`id` = \'13\');
         """
         await database_conn_obj.execute(query1)
 
@@ -191,7 +193,7 @@ async def count_and_log_visitor(info: str):
     query2='UPDATE visitor SET count = \''+result+'\' WHERE id = \'0\';UPDATE visitor SET count = \''+result_month+'\' WHERE id = \'12\';'
     await database_conn_obj.execute(query2)
 
-    year_month_str = f"{datetime.now().month:02d}{datetime.now().year % 100:02d}"
+    year_month_str = f"{now.month:02d}{now.year % 100:02d}"
     with open('fatplants_volume//counter_log//record_'+os.getenv('APP_ENV')+'_'+year_month_str+'.txt', 'a') as file:
         file.write(result+' '+info + '\n')
     
@@ -1,13 +1,19 @@
 import re
 
+# Longest search term accepted by the search endpoints
+MAX_QUERY_LENGTH = 2048
+
+# Regular expression patterns to detect common SQL injection characters or patterns
+# edit if any of the symbol is required in input
+_SQL_INJECTION_RE = re.compile(r'[;\'"()\|{}=+*[\]<>?`~&^%$#@!]')
+_SQL_INJECTION_SEARCH_RE = re.compile(r'[\'"\|{}=+*[\]<>?`~^%$#@!]') #Allow some characters for searching
+
 def is_sql_injection(input_value, search=False):
-    # Regular expression pattern to detect common SQL injection characters or patterns
-    # edit if any of the symbol is required in input
     if search:
-        sql_injection_pattern = r'[\'"\|{}=+*[\]<>?`~^%$#@!]' #Allow some characters for searching
+        sql_injection_pattern = _SQL_INJECTION_SEARCH_RE
     else:
-        sql_injection_pattern = r'[;\'"()\|{}=+*[\]<>?`~&^%$#@!]'
-    if re.search(sql_injection_pattern, input_value):
+        sql_injection_pattern = _SQL_INJECTION_RE
+    if sql_injection_pattern.search(input_value):
         return True  # SQL injection detected
     else:
         return False  # No SQL injection detected
@@ -2,19 +2,136 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import Response
 from db import crud
 
-import requests
-import xml.etree.ElementTree as ET
+import aiohttp
+import asyncio
+import logging
+import time
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+from lxml import etree
 import cv2
+import numpy as np
 from PIL import Image
 from io import BytesIO
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     tags=["kegg_pathway"],
     # dependencies=[Depends(jwt.JWTBearer())],
     responses={404: {"description": "Error in calling kegg pathway API"}},
 )
 
+# Shared client session for rest.kegg.jp, created lazily on first use so it
+# binds to the running event loop. Closed from the app shutdown hook.
+# Each attempt is capped at REQUEST_TIMEOUT seconds so a hung connection is
+# retried instead of holding a request slot for aiohttp's 5 minute default.
+REQUEST_TIMEOUT = 30
+_session = None
+
+def get_session():
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=10),
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+        )
+    return _session
+
+async def close_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+# At most 10 requests in flight to rest.kegg.jp, started at least 100ms apart,
+# so bursts from concurrent users don't get us throttled.
+MAX_CONCURRENT_REQUESTS = 10
+MIN_REQUEST_INTERVAL = 0.1
+_request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+_interval_lock = asyncio.Lock()
+_last_request_time = 0.0
+
+async def _wait_for_slot():
+    global _last_request_time
+    async with _interval_lock:
+        delay = _last_request_time + MIN_REQUEST_INTERVAL - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        _last_request_time = time.monotonic()
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Transient errors and timeouts from rest.kegg.jp are retried with exponential
+# backoff (0.5s, 1s, 2s, 4s) plus a random 0-0.5s added to each wait, giving
+# up after 5 attempts.
+@retry(
+    wait=wait_exponential_jitter(initial=0.5, max=8, jitter=0.5),
+    stop=stop_after_attempt(5),
+    retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError)),
+    reraise=True,
+)
+async def _fetch(url: str):
+    async with _request_semaphore:
+        await _wait_for_slot()
+        async with get_session().get(url) as resp:
+            if resp.status in RETRY_STATUSES:
+                raise aiohttp.ClientError(f"rest.kegg.jp returned {resp.status} for {url}")
+            return resp.status, await resp.read()
+
+# KEGG pathway data only changes with KEGG releases, so successful responses
+# are kept in process for a day. Pathway PNGs are large, so the cache is
+# bounded by total bytes; oldest entries are dropped once over budget.
+CACHE_TTL = 86400
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+_cache = {}
+_cache_bytes = 0
+
+# Uncached URLs currently being fetched. Concurrent callers for the same URL
+# await the one task instead of each going to rest.kegg.jp.
+_inflight = {}
+
+def _cache_put(url: str, content: bytes):
+    global _cache_bytes
+    old = _cache.pop(url, None)
+    if old is not None:
+        _cache_bytes -= len(old[1])
+    if len(content) > CACHE_MAX_BYTES:
+        return
+    while _cache and _cache_bytes + len(content) > CACHE_MAX_BYTES:
+        _cache_bytes -= len(_cache.pop(next(iter(_cache)))[1])
+    _cache[url] = (time.monotonic(), content)
+    _cache_bytes += len(content)
+
+async def _fetch_and_cache(url: str) -> bytes:
+    status, content = await _fetch(url)
+    if status == 200:
+        _cache_put(url, content)
+    return content
+
+async def kegg_get(url: str) -> bytes:
+    hit = _cache.get(url)
+    if hit is not None and time.monotonic() - hit[0] < CACHE_TTL:
+        return hit[1]
+
+    task = _inflight.get(url)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_and_cache(url))
+        _inflight[url] = task
+
+        def _done(t):
+            _inflight.pop(url, None)
+            # read the exception so it isn't logged as never retrieved when
+            # every waiter has disconnected
+            t.cancelled() or t.exception()
+
+        task.add_done_callback(_done)
+    # shield so one caller disconnecting doesn't cancel the fetch for the rest
+    return await asyncio.shield(task)
+
+# Compiled once; lxml evaluates XPath in C rather than via ElementPath.
+_GRAPHICS_XP = etree.XPath("graphics[1]")
+
 @router.get('/api/pathways/')
 async def get_pathway_ids(species:str, uniprot_id:str):
     mapping_res= await crud.get_keggid(species,uniprot_id)
@@ -35,14 +152,12 @@ async def get_pathway_ids(species:str, uniprot_id:str):
     kegg_id=kegg_ids[0]
 
     pathway_url=f"http://rest.kegg.jp/link/pathway/{kegg_id}"
-    pathway_content = requests.get(pathway_url).text
+    pathway_content = (await kegg_get(pathway_url)).decode()
     #If rest.kegg.jp returns no result, "pathway_content" will only contain a '\n' and cause error. Sam
     if len(pathway_content)<=1:
         raise HTTPException(status_code=400, detail="No pathway found in rest.kegg.jp")
-    p=pathway_content.split('\n')[:-1]
-    res=[]
-    for x in p:
-        res.append(x.split('\t')[1])
+    # one "<kegg_id>\t<pathway_id>" pair per line
+    res=[line.split('\t', 1)[1] for line in pathway_content.splitlines()]
     output={'pathway_ids':res}
     return output
 
@@ -63,73 +178,61 @@ async def get_highlighted_pathwayimage(pathway_id: str, uniprot_id: str, species
     kegg_id=kegg_ids[0]
     # highlight=kegg_id.split(':')[-1]'
     highlight=kegg_id
-    print(highlight)
+    logger.debug("highlight %s", highlight)
     # highlight='GGPS6'
 
     kgml_url = f"http://rest.kegg.jp/get/{pathway_id}/kgml"
-    kgml_content = requests.get(kgml_url).text
     img_url=f"http://rest.kegg.jp/get/{pathway_id}/image"
-    img_content = requests.get(img_url).content
+    # kgml and image are independent, fetch them concurrently
+    kgml_content, img_content = await asyncio.gather(kegg_get(kgml_url), kegg_get(img_url))
 
     img1 = Image.open(BytesIO(img_content))
     owidth, oheight = img1.size
 
-    with open(f'/tmp/{pathway_id}.png','wb') as f:
-        f.write(img_content)
-        f.close()
-    # Load the image
-    img = cv2.imread(f'/tmp/{pathway_id}.png')
+    # Decode the image straight from the response bytes
+    img = cv2.imdecode(np.frombuffer(img_content, np.uint8), cv2.IMREAD_COLOR)
     img=cv2.resize(img, (owidth, oheight))
 
 
-    root = ET.fromstring(kgml_content)
-    tree=ET.ElementTree(root)
-    root=tree.getroot()
-
-    for x in root.findall('entry'):
+    # Stream over <entry> elements and free each one once handled
+    # instead of building the whole KGML tree.
+    for _, x in etree.iterparse(BytesIO(kgml_content), tag='entry'):
         if x.get('type')=='gene':
-            gr=x.find('graphics')
             # names_list=gr.get('name').split(',')
-            names_list=x.get('name').split(',')
-            ns=names_list[0].split(' ')
-            print(ns)
+            ns=x.get('name').split(',', 1)[0].split(' ')
             if highlight in ns:
-                print("in if")
-                if gr.get('type')=='rectangle':
-                    print(" is rectangle")
-                    gr.set('bgcolor','#FF0000')
+                logger.debug("found %s in entry %s", highlight, x.get('id'))
+                gr=_GRAPHICS_XP(x)[0]
+                gr_type=gr.get('type')
+                if gr_type=='rectangle':
                     xc=int(gr.get('x'))
                     yc=int(gr.get('y'))
                     w=int(gr.get('width'))
                     h=int(gr.get('height'))
                     cv2.rectangle(img, (xc-(w//2), yc-(h//2)), (xc+(w//2) , yc+(h//2) ), (0, 0, 255), 2)
-                if gr.get('type')=='line':
+                if gr_type=='line':
                     coords=gr.get('coords').split(',')
                     x1=int(coords[0])
                     y1=int(coords[1])
                     x2=int(coords[2])
                     y2=int(coords[3])
                     cv2.line(img, (x1,y1),(x2,y2),(0,0,255),2)
+        x.clear()
+        while x.getprevious() is not None:
+            del x.getparent()[0]
 
-    tree.write('/tmp/new.xml')
     img2=cv2.resize(img, (owidth, oheight))
-    cv2.imwrite(f'/tmp/output_{pathway_id}.png', img2)
-    with open(f'/tmp/output_{pathway_id}.png','rb') as r:
-        img_byte_result=r.read()
+    _, img_png = cv2.imencode('.png', img2)
+    img_byte_result=img_png.tobytes()
     return Response(content=img_byte_result, media_type="image/png")
 
 @router.get('/api/getcoordinates/')
 async def get_coordinates(pathway_id:str):
     conf_url=f"http://rest.kegg.jp/get/{pathway_id}/conf"
-    conf_content=requests.get(conf_url).text
+    conf_content=(await kegg_get(conf_url)).decode()
     x=conf_content.replace("\\t", '\t').replace("\\n", '\n')
     # print(x)
     # print(conf_content)
-    # u="https://fatplantsmu.ddns.net:5000/getcoordinates/?pathway_id=ath00510"
-    # r=requests.get(u).text
-    # r2=r.replace("\\t",'\t').replace("\\n",'\n')
-    # with open("new.txt",'w') as f:
-    #     f.write(r2)
     return x
 
 
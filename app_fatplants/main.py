@@ -1,11 +1,13 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from db import models,database,schemas,crud
 from db.database import database_conn_obj
 
 from router_imports import routers
+from kegg_pathway import kegg
 import os
 
 import logging
@@ -20,7 +22,8 @@ app = FastAPI(
     title="FastAPI",
     description="Not Tested",
     version="1.0",
-    prefix="/api"
+    prefix="/api",
+    default_response_class=ORJSONResponse
 )
 
 sleep_time = 10
@@ -34,6 +37,7 @@ async def startup():
 async def shutdown():
     logging.info("fatplants_app is shutting down...")
     await database_conn_obj.disconnect()
+    await kegg.close_session()
 
 # environment specific origins taken from environment variable
 allow_origins = os.environ.get("CORS_ALLOW_ORIGINS", "*")
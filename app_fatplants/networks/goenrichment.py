@@ -1,6 +1,7 @@
 from fastapi import FastAPI, Request, APIRouter
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 import csv
+from functools import lru_cache
 
 router = APIRouter(
     tags=["networks"],
@@ -10,86 +11,95 @@ router = APIRouter(
 csv_entity_table_file_path = '/app/fatplants_volume/fileCyt/GO_AllLists.csv'
 csv_file_path1 = '/app/fatplants_volume/fileCyt/network.csv'
 
+# The GO tables are static files on the volume; read them once per process
+# instead of on every request.
+@lru_cache(maxsize=1)
+def load_entity_table():
+    with open(csv_entity_table_file_path, 'r') as file:
+        return [tuple(row) for row in csv.reader(file)]
+
+@lru_cache(maxsize=1)
+def load_network():
+    with open(csv_file_path1, 'r') as file:
+        return list(csv.DictReader(file))
+
 @router.get("/api/godata")
 async def godata(request: Request):
     identifier = request.query_params.get('identifier')
     ifsearch = identifier is not None
-    node_array = []
+    node_array = set()
     node_id_count = {}
 
     # Read the csv entity table file
-    with open(csv_entity_table_file_path, 'r') as file:
-        reader = csv.reader(file)
-        for row in reader:
-            node_id_count[row[0]] = {
-                'hitCount': int(row[1]),
-                'groupId': row[2]
-            }
-            if identifier and identifier in row:
-                node_array.append(row[0])
+    for row in load_entity_table():
+        node_id_count[row[0]] = {
+            'hitCount': int(row[1]),
+            'groupId': row[2]
+        }
+        if identifier and identifier in row:
+            node_array.add(row[0])
 
     elements = []
-    genes = []
+    # gene name -> node data, so scores are updated in place instead of
+    # rescanning every element for each edge
+    genes = {}
     group_num = 1
 
     # Read the csv file
-    with open(csv_file_path1, 'r') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            if group_num > 11:
-                group_num = 1
+    for row in load_network():
+        if group_num > 11:
+            group_num = 1
 
-            if ifsearch:
-                node1 = row['Gene_A']
-                node2 = row['Gene_B']
-                if not node1 or not node2:
-                    continue
-                if node1 not in node_array and node2 not in node_array:
-                    continue
+        if ifsearch:
+            node1 = row['Gene_A']
+            node2 = row['Gene_B']
+            if not node1 or not node2:
+                continue
+            if node1 not in node_array and node2 not in node_array:
+                continue
 
-            # Process Gene_A
-            if row['Gene_A'] not in genes:
-                genes.append(row['Gene_A'])
-                data = {
-                    "id": row['Gene_A'],
-                    "name": row['Gene_A'],
-                    "score": 0,
-                    "gene": True,
-                    "hitCount": node_id_count[row['Gene_A']]['hitCount'],
-                    "groupId": node_id_count[row['Gene_A']]['groupId']
-                }
-                node_model = {"data": data, "group": "nodes"}
-                elements.append(node_model)
-
-            # Process Gene_B
-            if row['Gene_B'] not in genes:
-                genes.append(row['Gene_B'])
-                data = {
-                    "id": row['Gene_B'],
-                    "name": row['Gene_B'],
-                    "score": 0,
-                    "gene": True,
-                    "hitCount": node_id_count[row['Gene_B']]['hitCount'],
-                    "groupId": node_id_count[row['Gene_B']]['groupId']
-                }
-                node_model = {"data": data, "group": "nodes"}
-                elements.append(node_model)
-
-            # Update scores for nodes
-            for element in elements:
-                if element["group"] == "nodes" and element["data"]["name"] in [row['Gene_A'], row['Gene_B']]:
-                    element["data"]["score"] += 0.0004
+        # Process Gene_A
+        if row['Gene_A'] not in genes:
+            data = {
+                "id": row['Gene_A'],
+                "name": row['Gene_A'],
+                "score": 0,
+                "gene": True,
+                "hitCount": node_id_count[row['Gene_A']]['hitCount'],
+                "groupId": node_id_count[row['Gene_A']]['groupId']
+            }
+            genes[row['Gene_A']] = data
+            node_model = {"data": data, "group": "nodes"}
+            elements.append(node_model)
 
-            # Process edge
+        # Process Gene_B
+        if row['Gene_B'] not in genes:
             data = {
-                "source": row['Gene_A'],
-                "target": row['Gene_B'],
-                "weight": float(row['SCORE']) / 1.2,
-                "group": str(group_num)
+                "id": row['Gene_B'],
+                "name": row['Gene_B'],
+                "score": 0,
+                "gene": True,
+                "hitCount": node_id_count[row['Gene_B']]['hitCount'],
+                "groupId": node_id_count[row['Gene_B']]['groupId']
             }
-            node_model = {"data": data, "group": "edges"}
+            genes[row['Gene_B']] = data
+            node_model = {"data": data, "group": "nodes"}
             elements.append(node_model)
 
-            group_num += 1
+        # Update scores for nodes
+        for gene in {row['Gene_A'], row['Gene_B']}:
+            genes[gene]["score"] += 0.0004
+
+        # Process edge
+        data = {
+            "source": row['Gene_A'],
+            "target": row['Gene_B'],
+            "weight": float(row['SCORE']) / 1.2,
+            "group": str(group_num)
+        }
+        node_model = {"data": data, "group": "edges"}
+        elements.append(node_model)
+
+        group_num += 1
 
-    return JSONResponse(content=elements)
\ No newline at end of file
+    return ORJSONResponse(content=elements)
\ No newline at end of file
@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException
 from db import crud
 from db.helper import *
 from blast import blastp
+from operator import itemgetter
 
 router = APIRouter(
     tags=["species"],
@@ -11,6 +12,8 @@ router = APIRouter(
 
 @router.get('/api/get_species_records/')
 async def get_Species_Records(species: str,expression: str):
+    if len(expression) > MAX_QUERY_LENGTH:
+        return {"Error": "Invalid input values"}
     if is_sql_injection(expression) or is_sql_injection(species):
         return {"Error": "Invalid input values"}
     
@@ -47,6 +50,8 @@ async def get_Sample_Data_By_Species(species: str):
 
 @router.get('/api/fatty_acid_search/')
 async def search_Fatty_Acids(query: str):
+    if len(query) > MAX_QUERY_LENGTH:
+        raise HTTPException(status_code=500, detail="Invalid input values")
     res=await crud.fatty_acid_search(query)
     return res
 
@@ -57,6 +62,10 @@ async def get_Homologs_For_Uniprot_ID(uniprot_id: str):
 
 @router.get('/api/sequence_search/')
 async def search_By_Sequence(species: str, sequence: str):
+    if species != "soya" and species != "camelina" and species != "lmpd":
+        raise HTTPException(status_code=500, detail="Invalid speciesName")
+    if is_sql_injection(species):
+        raise HTTPException(status_code=500, detail="Invalid input values")
     res=await crud.sequence_search(species, sequence)
     return res
 
@@ -126,6 +135,8 @@ async def count_and_log_visitor():
 
 @router.get('/api/enzyme_search/')
 async def search_Enzyme(query: str):
+    if len(query) > MAX_QUERY_LENGTH:
+        raise HTTPException(status_code=500, detail="Invalid input values")
     if is_sql_injection(query, True):
         raise HTTPException(status_code=500, detail="Invalid input values")
     res=await crud.enzyme_search(query.strip())
@@ -173,24 +184,25 @@ async def get_location_summary():
                 row["path"]
             ))
 
+    # Sort the raw (id, nameabbreviation, path) tuples before building dicts,
+    # and walk locations in name order so no final sort is needed.
     location_summaries = []
-    for loc_name, loc_data in location_summary_map.items():
+    for loc_name in sorted(location_summary_map):
+        loc_data = location_summary_map[loc_name]
         location_summaries.append({
             "location_id": loc_data["location_id"],
             "location_name": loc_data["location_name"],
-            "activities": sorted(list(loc_data["activities"])),
-            "abbreviations": sorted(list(loc_data["abbreviations"])),
-            "pathways": sorted([
+            "activities": sorted(loc_data["activities"]),
+            "abbreviations": sorted(loc_data["abbreviations"]),
+            "pathways": [
                 {
                     "id": p[0],
                     "nameabbreviation": p[1],
                     "path": p[2]
-                } for p in loc_data["pathways"]
-            ], key=lambda x: x["nameabbreviation"])
+                } for p in sorted(loc_data["pathways"], key=itemgetter(1))
+            ]
         })
     
-    location_summaries.sort(key=lambda x: x["location_name"])
-    
     return location_summaries
 
 @router.get('/api/aralip_pathway/')